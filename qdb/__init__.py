@@ -1,15 +1,47 @@
+import bdb
+import itertools
 import pdb
 import sys
+import sysconfig
 from typing import Any
 
 from forest.benchmarking.tomography import *
 from pyquil import Program
 from pyquil.api import QuantumComputer
-from pyquil.operator_estimation import measure_observables
+from pyquil.operator_estimation import (
+    ExperimentSetting,
+    TensorProductState,
+    TomographyExperiment,
+    measure_observables,
+)
 from pyquil.quilbase import Gate
 
+from qdb.breakpoints import (
+    QubitBreakpoint,
+    LengthBreakpoint,
+    LabelBreakpoint,
+    EntanglementBreakpoint,
+)
 from qdb.control_flow_graph import QuilControlFlowGraph
-from qdb.utils import trim_program, get_necessary_qubits
+from qdb.utils import (
+    trim_program,
+    get_necessary_qubits,
+    get_independent_components,
+    tensor_components,
+    parse_pauli_string,
+    group_observables,
+)
+
+LIBRARY_PATHS = tuple(
+    set(
+        sysconfig.get_paths()[k] for k in ("stdlib", "platstdlib", "purelib", "platlib")
+    )
+)
+
+
+def is_library_frame(frame: Any) -> bool:
+    """Returns whether `frame` runs code from the standard library or site-packages"""
+    return frame.f_code.co_filename.startswith(LIBRARY_PATHS)
 
 
 class Qdb(pdb.Pdb):
@@ -36,6 +68,120 @@ class Qdb(pdb.Pdb):
         self.qc = qc
         self.program = program
         self.prompt = "(Qdb) "
+        # Quantum breakpoints keyed by a stable number, as with pdb's breakpoints
+        self.quantum_breaks = {}
+        self.next_quantum_break = 0
+        self.checked_length = len(program)
+
+    def dispatch_line(self, frame: Any) -> Any:
+        """
+        Checks quantum breakpoints against the instructions appended to the program
+        since the last line event before falling back to pdb's line dispatch. Library
+        frames are not checked, so that we never stop halfway through pyquil
+        appending an instruction.
+        """
+        if (
+            self.quantum_breaks
+            and len(self.program) != self.checked_length
+            and not is_library_frame(frame)
+        ):
+            if self.check_quantum_breaks():
+                self.user_line(frame)
+                if self.quitting:
+                    raise bdb.BdbQuit
+                return self.trace_dispatch
+        return pdb.Pdb.dispatch_line(self, frame)
+
+    def check_quantum_breaks(self) -> bool:
+        """Returns whether any quantum breakpoint is hit by the new instructions"""
+        # The program may have shrunk, in which case there is nothing new to check
+        start = min(self.checked_length, len(self.program))
+        new_instructions = self.program.instructions[start:]
+        self.checked_length = len(self.program)
+        hit = False
+        for i, bp in self.quantum_breaks.items():
+            if bp.check(self.program, new_instructions):
+                self.message(f"Quantum breakpoint {i}: {bp}")
+                hit = True
+        return hit
+
+    def break_anywhere(self, frame: Any) -> bool:
+        # Quantum breakpoints are checked from line events, so new frames of the
+        # program being debugged must be traced while there are any
+        if self.quantum_breaks and not is_library_frame(frame):
+            return True
+        return pdb.Pdb.break_anywhere(self, frame)
+
+    def set_continue(self) -> None:
+        # pdb stops tracing when there are no breakpoints, but quantum breakpoints
+        # are checked from the trace function
+        if self.quantum_breaks:
+            self._set_stopinfo(self.botframe, None, -1)
+        else:
+            pdb.Pdb.set_continue(self)
+
+    def do_qbreak(self, arg: str) -> None:
+        """qb(reak) [qubit index | length n | label | ent index size]
+        Without argument, list all quantum breakpoints. With an argument, stop when
+        the program first touches qubit `index`, when its instruction count first
+        exceeds `n`, whenever a new label is appended, or when the entanglement set
+        of qubit `index` first grows beyond `size` qubits.
+        """
+        if not arg:
+            for i, bp in self.quantum_breaks.items():
+                self.message(f"{i}: {bp}")
+            return
+
+        kind, *params = arg.split()
+        try:
+            params = [int(x) for x in params]
+            if kind == "qubit" and len(params) == 1:
+                bp = QubitBreakpoint(self.program, *params)
+            elif kind == "length" and len(params) == 1:
+                bp = LengthBreakpoint(self.program, *params)
+            elif kind == "label" and len(params) == 0:
+                bp = LabelBreakpoint()
+            elif kind == "ent" and len(params) == 2:
+                bp = EntanglementBreakpoint(self.program, *params)
+            else:
+                raise ValueError
+        except ValueError:
+            self.message(
+                "Usage: qbreak [qubit index | length n | label | ent index size]"
+            )
+            return
+        if bp.hit:
+            self.message(f"Condition already holds for the program: {bp}")
+            return
+
+        if not self.quantum_breaks:
+            self.checked_length = len(self.program)
+        self.quantum_breaks[self.next_quantum_break] = bp
+        self.message(f"Quantum breakpoint {self.next_quantum_break}: {bp}")
+        self.next_quantum_break += 1
+
+    do_qb = do_qbreak
+
+    def do_qclear(self, arg: str) -> None:
+        """qclear [bpnumber [bpnumber...]]
+        Delete the quantum breakpoints with the given numbers. Without argument,
+        delete all quantum breakpoints.
+        """
+        if not arg:
+            self.quantum_breaks = {}
+            return
+        try:
+            numbers = [int(x) for x in arg.split()]
+        except ValueError:
+            self.message(
+                "Breakpoint numbers must be specified as a space-separated list"
+            )
+            return
+        for i in numbers:
+            if i in self.quantum_breaks:
+                del self.quantum_breaks[i]
+            else:
+                self.message(f"No quantum breakpoint numbered {i}")
 
     def do_entanglement(self, arg: str) -> None:
         """
@@ -99,19 +245,88 @@ class Qdb(pdb.Pdb):
         if not QuilControlFlowGraph(trimmed_program).is_dag():
             raise ValueError("Program is not a dag!")
 
-        experiment = generate_state_tomography_experiment(trimmed_program, qubits)
+        # Qubits that are never entangled or linked through control flow are
+        # tomographed as separate components. Each setting only acts on its own
+        # component: merging settings across components would make readout
+        # symmetrization exponential in the total qubit count again.
+        components = get_independent_components(self.program, qubits)
+        if len(components) > 1:
+            self.message(f"Independent components: {components}")
+        experiment = TomographyExperiment(
+            settings=list(
+                itertools.chain.from_iterable(
+                    generate_state_tomography_experiment(trimmed_program, component)
+                    for component in components
+                )
+            ),
+            program=trimmed_program,
+        )
         # TODO: Let user specify n_shots (+ other params)
         results = list(
             measure_observables(qc=self.qc, tomo_experiment=experiment, n_shots=1000)
         )
         # TODO: Let user specify algorithm
-        rho_est = linear_inv_state_estimate(results, qubits)
+        rhos = [
+            linear_inv_state_estimate(
+                [
+                    result
+                    for result in results
+                    if set(result.setting.out_operator.get_qubits()) <= set(component)
+                ],
+                component,
+            )
+            for component in components
+        ]
+        rho_est = tensor_components(rhos, components, qubits)
         self.message(np.round(rho_est, 4))
         self.message("Purity: {}".format(np.trace(np.matmul(rho_est, rho_est))))
         self.recreate_wavefunction(rho_est)
 
     do_tom = do_tomography
 
+    def do_expect(self, arg: str) -> None:
+        """expect pauli_string [pauli_string...]
+        Estimates the expectation values of the space-separated list of Pauli
+        strings, e.g. `expect Z0Z1 X2`. Only the light cones of the qubits involved
+        are run, and qubit-wise commuting observables share measurement settings
+        where that saves work.
+        """
+        try:
+            terms = [parse_pauli_string(x) for x in arg.split()]
+        except ValueError as e:
+            self.message(str(e))
+            return
+        if not terms:
+            self.message("Pauli strings must be specified as a space-separated list")
+            return
+
+        qubits = sorted(
+            set(itertools.chain.from_iterable(t.get_qubits() for t in terms))
+        )
+        trimmed_program = trim_program(self.program, qubits)
+        if not QuilControlFlowGraph(trimmed_program).is_dag():
+            raise ValueError("Program is not a dag!")
+
+        groups = group_observables(terms)
+        self.message(f"Measurement settings: {len(groups)}")
+        experiment = TomographyExperiment(
+            settings=[
+                [ExperimentSetting(TensorProductState(), term) for term in group]
+                for group in groups
+            ],
+            program=trimmed_program,
+        )
+        # TODO: Let user specify n_shots (+ other params)
+        results = list(
+            measure_observables(qc=self.qc, tomo_experiment=experiment, n_shots=1000)
+        )
+        for pauli_string, term in zip(arg.split(), terms):
+            result = next(r for r in results if r.setting.out_operator == term)
+            self.message(
+                f"<{pauli_string}> = {np.round(result.expectation, 4)} "
+                f"\u00b1 {np.round(result.std_err, 4)}"
+            )
+
     def do_print_quil(self, arg: str) -> None:
         self.message(self.program)
 
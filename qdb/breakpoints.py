@@ -0,0 +1,132 @@
+from abc import ABC, abstractmethod
+from typing import List, Set
+import networkx as nx
+
+from pyquil import Program
+from pyquil.quilbase import AbstractInstruction, Jump, JumpConditional, JumpTarget
+
+from qdb.control_flow_graph import QuilBlock, QuilControlFlowGraph
+from qdb.utils import get_necessary_qubits
+
+
+class QuantumBreakpoint(ABC):
+    """
+    A condition on the program being debugged. Breakpoints are checked against
+    only the instructions appended since the last check, so that they can be
+    evaluated cheaply from the trace function. Conditions that only fire once are
+    marked `hit`, including when they already hold for the program they are created
+    on.
+    """
+
+    hit = False
+
+    @abstractmethod
+    def check(
+        self, program: Program, new_instructions: List[AbstractInstruction]
+    ) -> bool:
+        """Returns whether the debugger should stop after `new_instructions`"""
+
+
+class QubitBreakpoint(QuantumBreakpoint):
+    """Stops when the program first touches `qubit`"""
+
+    def __init__(self, program: Program, qubit: int) -> None:
+        self.qubit = qubit
+        self.hit = qubit in program.get_qubits()
+
+    def __str__(self) -> str:
+        return f"qubit {self.qubit}"
+
+    def check(
+        self, program: Program, new_instructions: List[AbstractInstruction]
+    ) -> bool:
+        if self.hit:
+            return False
+        self.hit = any(
+            self.qubit in inst.get_qubits()
+            for inst in new_instructions
+            if hasattr(inst, "get_qubits")
+        )
+        return self.hit
+
+
+class LengthBreakpoint(QuantumBreakpoint):
+    """Stops when the instruction count first exceeds `length`"""
+
+    def __init__(self, program: Program, length: int) -> None:
+        self.length = length
+        self.hit = len(program) > length
+
+    def __str__(self) -> str:
+        return f"length {self.length}"
+
+    def check(
+        self, program: Program, new_instructions: List[AbstractInstruction]
+    ) -> bool:
+        if self.hit:
+            return False
+        self.hit = len(program) > self.length
+        return self.hit
+
+
+class LabelBreakpoint(QuantumBreakpoint):
+    """Stops whenever a new JumpTarget is appended"""
+
+    def __str__(self) -> str:
+        return "label"
+
+    def check(
+        self, program: Program, new_instructions: List[AbstractInstruction]
+    ) -> bool:
+        return any(isinstance(inst, JumpTarget) for inst in new_instructions)
+
+
+class EntanglementBreakpoint(QuantumBreakpoint):
+    """
+    Stops when the entanglement set of `qubit` first grows beyond `size` qubits.
+
+    Until the program contains control flow, the entanglement set is maintained
+    incrementally from the local entangled and dependency graphs of the new
+    instructions. Afterwards it is recomputed with `get_necessary_qubits`.
+    """
+
+    def __init__(self, program: Program, qubit: int, size: int) -> None:
+        self.qubit = qubit
+        self.size = size
+        self.has_control_flow = False
+        self.dependency_graph = nx.Graph()
+        self._add_instructions(program.instructions)
+        self.hit = len(self.get_entanglement_set(program)) > size
+
+    def __str__(self) -> str:
+        return f"ent {self.qubit} {self.size}"
+
+    def _add_instructions(self, instructions: List[AbstractInstruction]) -> None:
+        if any(isinstance(inst, (Jump, JumpConditional)) for inst in instructions):
+            self.has_control_flow = True
+        block = QuilBlock(0, instructions, [])
+        self.dependency_graph.add_edges_from(block.get_local_entangled_graph().edges)
+        self.dependency_graph.add_edges_from(block.get_local_dependency_graph().edges)
+
+    def get_entanglement_set(self, program: Program) -> Set[int]:
+        """Returns the current entanglement set of `qubit`"""
+        if self.has_control_flow:
+            cfg = QuilControlFlowGraph(program)
+            return get_necessary_qubits(cfg, len(cfg.blocks) - 1, [self.qubit])
+        if self.qubit not in self.dependency_graph:
+            return set([self.qubit])
+        return set(
+            filter(
+                lambda i: isinstance(i, int),
+                nx.node_connected_component(self.dependency_graph, self.qubit),
+            )
+        )
+
+    def check(
+        self, program: Program, new_instructions: List[AbstractInstruction]
+    ) -> bool:
+        if self.hit:
+            return False
+        self._add_instructions(new_instructions)
+        self.hit = len(self.get_entanglement_set(program)) > self.size
+        return self.hit
@@ -0,0 +1,190 @@
+import io
+import sys
+import pytest
+
+from pyquil import Program
+from pyquil.gates import X, H, CNOT
+
+from qdb import Qdb
+from qdb.breakpoints import (
+    QubitBreakpoint,
+    LengthBreakpoint,
+    LabelBreakpoint,
+    EntanglementBreakpoint,
+)
+
+
+def run_breakpoint(bp, pq, insts):
+    """Appends `insts` one at a time and returns the indices where `bp` was hit"""
+    hits = []
+    for i, inst in enumerate(insts):
+        start = len(pq)
+        pq += inst
+        if bp.check(pq, pq.instructions[start:]):
+            hits.append(i)
+    return hits
+
+
+def test_qubit():
+    bp = QubitBreakpoint(Program(), 2)
+    assert run_breakpoint(bp, Program(), [H(0), CNOT(0, 1), CNOT(1, 2), X(2)]) == [2]
+
+
+def test_length():
+    pq = Program(H(0))
+    bp = LengthBreakpoint(pq, 2)
+    assert run_breakpoint(bp, pq, [X(0), X(1), X(2), X(3)]) == [1]
+
+
+def test_qubit_already_touched():
+    pq = Program(CNOT(0, 2))
+    bp = QubitBreakpoint(pq, 2)
+    assert bp.hit
+    assert run_breakpoint(bp, pq, [X(2), CNOT(1, 2)]) == []
+
+
+def test_length_already_exceeded():
+    pq = Program(H(0), X(1), X(2))
+    bp = LengthBreakpoint(pq, 2)
+    assert bp.hit
+    assert run_breakpoint(bp, pq, [X(0), X(1)]) == []
+
+
+def test_entanglement_already_exceeded():
+    pq = Program(CNOT(0, 1))
+    bp = EntanglementBreakpoint(pq, 0, 1)
+    assert bp.hit
+    assert run_breakpoint(bp, pq, [CNOT(1, 2)]) == []
+
+
+def test_label():
+    pq = Program(H(0))
+    ro = pq.declare("ro")
+    pq.measure(0, ro)
+    bp = LabelBreakpoint()
+    branch = Program().if_then(ro, X(1))
+    assert run_breakpoint(bp, pq, [X(0), branch, X(0)]) == [1]
+
+
+@pytest.mark.parametrize("size, hit", [(1, 0), (2, 2), (3, 2), (4, 3), (5, None)])
+def test_entanglement(size, hit):
+    pq = Program(H(0))
+    bp = EntanglementBreakpoint(pq, 0, size)
+    hits = run_breakpoint(bp, pq, [CNOT(0, 1), CNOT(2, 3), CNOT(1, 2), CNOT(3, 4)])
+    assert hits == ([] if hit is None else [hit])
+
+
+def test_entanglement_control_flow():
+    pq = Program(H(0))
+    ro = pq.declare("ro")
+    pq.measure(0, ro)
+    bp = EntanglementBreakpoint(pq, 0, 1)
+    branch = Program().if_then(ro, CNOT(0, 1))
+    assert run_breakpoint(bp, pq, [X(1), branch]) == [1]
+
+
+def test_qclear_numbers():
+    stdout = io.StringIO()
+    qdb = Qdb(None, Program(), stdout=stdout, readrc=False)
+    qdb.onecmd("qbreak qubit 5")
+    qdb.onecmd("qbreak qubit 6")
+    qdb.onecmd("qclear 0")
+    assert [str(bp) for bp in qdb.quantum_breaks.values()] == ["qubit 6"]
+    qdb.onecmd("qclear 1")
+    assert qdb.quantum_breaks == {}
+    qdb.onecmd("qbreak label")
+    assert list(qdb.quantum_breaks) == [2]
+    qdb.onecmd("qclear 0")
+    assert "No quantum breakpoint numbered 0" in stdout.getvalue()
+    assert list(qdb.quantum_breaks) == [2]
+
+
+def build_program(qdb, pq):
+    """Stops in qdb before appending X(0), ..., X(5) to `pq`"""
+    stops = []
+    qdb.set_trace(sys._getframe())
+    for i in range(6):
+        pq += X(i)
+    return stops
+
+
+def append_qubits(pq, stops):
+    for i in range(6):
+        pq += X(i)
+
+
+def build_program_in_helper(qdb, pq):
+    """Stops in qdb before calling a helper that appends X(0), ..., X(5) to `pq`"""
+    stops = []
+    qdb.set_trace(sys._getframe())
+    append_qubits(pq, stops)
+    return stops
+
+
+def run_commands(pq, commands, build=build_program):
+    stdout = io.StringIO()
+    qdb = Qdb(
+        None,
+        pq,
+        stdin=io.StringIO(commands),
+        stdout=stdout,
+        nosigint=True,
+        readrc=False,
+    )
+    try:
+        stops = build(qdb, pq)
+        return stops, sys.gettrace(), stdout.getvalue()
+    finally:
+        sys.settrace(None)
+
+
+def test_trace_qbreak():
+    pq = Program()
+    commands = "qbreak qubit 3\ncontinue\n!stops.append(i)\nqclear\ncontinue\n"
+    stops, trace, output = run_commands(pq, commands)
+    assert stops == [3]
+    assert "Quantum breakpoint 0: qubit 3" in output
+    assert len(pq) == 6
+    assert trace is None
+
+
+def test_trace_qbreak_in_helper():
+    pq = Program()
+    commands = "qbreak qubit 3\ncontinue\n!stops.append(i)\nqclear\ncontinue\n"
+    stops, trace, output = run_commands(pq, commands, build_program_in_helper)
+    assert stops == [3]
+    assert "Quantum breakpoint 0: qubit 3" in output
+    assert len(pq) == 6
+    assert trace is None
+
+
+def test_trace_multiple_qbreaks():
+    pq = Program()
+    commands = (
+        "qbreak length 1\nqbreak qubit 4\ncontinue\n!stops.append(i)\n"
+        "continue\n!stops.append(i)\ncontinue\n"
+    )
+    stops, trace, output = run_commands(pq, commands)
+    assert stops == [1, 4]
+    assert len(pq) == 6
+    # Quantum breakpoints keep tracing on after continue
+    assert trace is not None
+
+
+def test_trace_continue_without_qbreaks():
+    pq = Program()
+    stops, trace, output = run_commands(pq, "!stops.append(len(pq))\ncontinue\n")
+    assert stops == [0]
+    assert len(pq) == 6
+    assert trace is None
+
+
+def test_qbreak_usage():
+    stdout = io.StringIO()
+    qdb = Qdb(None, Program(X(3)), stdout=stdout, readrc=False)
+    for arg in ["qubit", "qubit a", "length 1 2", "label 0", "ent 0", "foo 1"]:
+        qdb.onecmd(f"qbreak {arg}")
+    assert stdout.getvalue().count("Usage: qbreak") == 6
+    qdb.onecmd("qbreak qubit 3")
+    assert "Condition already holds for the program: qubit 3" in stdout.getvalue()
+    assert qdb.quantum_breaks == {}
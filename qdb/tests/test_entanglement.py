@@ -1,10 +1,25 @@
+import functools
+import itertools
 import pytest
+import numpy as np
 
+from forest.benchmarking.tomography import linear_inv_state_estimate
 from pyquil import Program
 from pyquil.gates import X, CNOT, CCNOT
+from pyquil.operator_estimation import (
+    ExperimentResult,
+    ExperimentSetting,
+    TensorProductState,
+)
+from pyquil.paulis import PauliTerm
+from pyquil.unitary_tools import lifted_pauli
 
 from qdb.control_flow_graph import QuilControlFlowGraph
-from qdb.utils import get_necessary_qubits
+from qdb.utils import (
+    get_necessary_qubits,
+    get_independent_components,
+    tensor_components,
+)
 
 
 @pytest.mark.parametrize(
@@ -64,3 +79,80 @@ def test_simple_control_flow():
         assert get_necessary_qubits(G, 2, qubits) == set([2, 3])
         assert get_necessary_qubits(G, 3, qubits) == set([2, 3])
         assert get_necessary_qubits(G, 4, qubits) == set([2, 3])
+
+
+@pytest.mark.parametrize(
+    "qubits, components",
+    [
+        ([0, 1, 2, 3, 4], [[0, 1, 2], [3, 4]]),
+        ([3, 0, 4], [[3, 4], [0]]),
+        ([1, 2], [[1, 2]]),
+        ([0, 5], [[0], [5]]),
+    ],
+)
+def test_independent_components(qubits, components):
+    pq = Program(CNOT(0, 1), CNOT(1, 2), CNOT(3, 4))
+    assert get_independent_components(pq, qubits) == components
+
+
+def test_control_flow_components():
+    pq = Program(CNOT(0, 1), CNOT(2, 3))
+    ro = pq.declare("ro")
+    pq.measure(0, ro)
+    pq.if_then(ro, Program(X(2)))
+    assert get_independent_components(pq, [0, 2]) == [[0, 2]]
+
+
+def exact_tomography_results(rho, qubits, tomography_qubits):
+    """
+    Returns exact results for every Pauli setting on `tomography_qubits` for the state
+    `rho` of `qubits`. As in forest-benchmarking 0.4, this includes the identity
+    setting, which `linear_inv_state_estimate` needs to recover the trace.
+    """
+    results = []
+    for ops in itertools.product("IXYZ", repeat=len(tomography_qubits)):
+        term = PauliTerm.from_list(
+            [(op, q) for op, q in zip(ops, tomography_qubits) if op != "I"]
+        )
+        expectation = np.real(np.trace(lifted_pauli(term, qubits) @ rho))
+        setting = ExperimentSetting(TensorProductState(), term)
+        results.append(
+            ExperimentResult(setting=setting, expectation=expectation, total_counts=1)
+        )
+    return results
+
+
+@pytest.mark.parametrize(
+    "qubits, components",
+    [
+        ([0, 1], [[0], [1]]),
+        ([0, 1, 2], [[0, 2], [1]]),
+        ([3, 0, 4], [[3, 4], [0]]),
+        ([2, 1, 0, 3], [[1, 3], [2, 0]]),
+    ],
+)
+def test_tensor_components(qubits, components):
+    rng = np.random.RandomState(0)
+    states = {}
+    for q in qubits:
+        psi = rng.randn(2) + 1j * rng.randn(2)
+        psi /= np.linalg.norm(psi)
+        states[q] = np.outer(psi, psi.conj())
+    # lifted_pauli puts the first qubit of `qubits` on the right
+    rho = functools.reduce(np.kron, [states[q] for q in qubits[::-1]])
+
+    rhos = [
+        linear_inv_state_estimate(
+            exact_tomography_results(rho, qubits, component), component
+        )
+        for component in components
+    ]
+    joint = linear_inv_state_estimate(
+        exact_tomography_results(rho, qubits, qubits), qubits
+    )
+    assert np.allclose(tensor_components(rhos, components, qubits), joint)
+    assert np.allclose(joint, rho)
+
+
+def test_tensor_no_components():
+    assert np.allclose(tensor_components([], [], []), np.ones((1, 1)))
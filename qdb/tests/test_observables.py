@@ -0,0 +1,76 @@
+import io
+import pytest
+
+from pyquil import Program
+from pyquil.gates import H, X, CNOT
+from pyquil.operator_estimation import ExperimentResult
+from pyquil.paulis import sX, sZ
+
+import qdb
+from qdb.utils import parse_pauli_string, group_observables
+
+
+def test_parse():
+    assert parse_pauli_string("Z0Z1") == sZ(0) * sZ(1)
+    assert parse_pauli_string("X12") == sX(12)
+
+
+@pytest.mark.parametrize("pauli_string", ["", "Z", "A0", "Z0 Z1", "Z0Z0"])
+def test_parse_invalid(pauli_string):
+    with pytest.raises(ValueError):
+        parse_pauli_string(pauli_string)
+
+
+def test_group():
+    terms = [sZ(0) * sZ(1), sX(2), sZ(0), sX(0), sZ(1) * sX(2), sZ(0) * sZ(1)]
+    assert group_observables(terms) == [
+        [sZ(0) * sZ(1), sZ(0), sZ(1) * sX(2)],
+        [sX(2), sX(0)],
+    ]
+
+
+def test_group_disjoint():
+    # Merging disjoint terms only pays off while the symmetrization cost of the
+    # merged setting is no more than that of measuring them apart
+    terms = [sX(0), sZ(1), sX(2) * sZ(3)]
+    assert group_observables(terms) == [[sX(0), sZ(1)], [sX(2) * sZ(3)]]
+    terms = [sZ(q) for q in range(7)]
+    assert group_observables(terms) == [
+        [sZ(0), sZ(1)],
+        [sZ(2), sZ(3)],
+        [sZ(4), sZ(5)],
+        [sZ(6)],
+    ]
+
+
+def test_expect(monkeypatch):
+    expectations = {"Z0Z1": 1.0, "Z0": 0.02, "X2": -1.0}
+    terms = {str(parse_pauli_string(k)): v for k, v in expectations.items()}
+    groups = []
+
+    def fake_measure_observables(qc, tomo_experiment, n_shots):
+        for group in tomo_experiment:
+            groups.append([str(setting.out_operator) for setting in group])
+            for setting in group:
+                yield ExperimentResult(
+                    setting=setting,
+                    expectation=terms[str(setting.out_operator)],
+                    std_err=0.01,
+                    total_counts=n_shots,
+                )
+
+    monkeypatch.setattr(qdb, "measure_observables", fake_measure_observables)
+    stdout = io.StringIO()
+    debugger = qdb.Qdb(None, Program(H(0), CNOT(0, 1), X(2)), stdout=stdout)
+    debugger.do_expect("Z0Z1 X2 Z0")
+
+    assert groups == [
+        [str(sZ(0) * sZ(1)), str(sZ(0))],
+        [str(sX(2))],
+    ]
+    assert stdout.getvalue().splitlines() == [
+        "Measurement settings: 2",
+        "<Z0Z1> = 1.0 \u00b1 0.01",
+        "<X2> = -1.0 \u00b1 0.01",
+        "<Z0> = 0.02 \u00b1 0.01",
+    ]
@@ -1,7 +1,11 @@
 from typing import List, Set
 import networkx as nx
+import numpy as np
+import functools
 import itertools
+import re
 from pyquil import Program
+from pyquil.paulis import PauliTerm
 from pyquil.quilbase import Gate
 
 from qdb.control_flow_graph import QuilControlFlowGraph
@@ -69,3 +73,94 @@ def trim_program(pq: Program, qubits: List[int]) -> Program:
     )
     # TODO: Try to remove unused basic blocks and repeat until convergence
     return trimmed_program
+
+
+def get_independent_components(pq: Program, qubits: List[int]) -> List[List[int]]:
+    """
+    Partitions `qubits` into components that are never entangled with each other or
+    linked through control flow in `pq`. Each component can be tomographed separately
+    and the full state recovered with `tensor_components`.
+    """
+    cfg = QuilControlFlowGraph(pq)
+    component_graph = nx.Graph()
+    component_graph.add_nodes_from(qubits)
+    for qubit in qubits:
+        for block_idx in range(len(cfg.blocks)):
+            necessary_qubits = get_necessary_qubits(cfg, block_idx, [qubit])
+            nx.add_path(component_graph, [qubit] + sorted(necessary_qubits))
+
+    components = []
+    for qubit in qubits:
+        if not any(qubit in component for component in components):
+            connected = nx.node_connected_component(component_graph, qubit)
+            components.append([q for q in qubits if q in connected])
+    return components
+
+
+def tensor_components(
+    rhos: List[np.ndarray], components: List[List[int]], qubits: List[int]
+) -> np.ndarray:
+    """
+    Returns the density matrix of `qubits` given by the tensor product of the density
+    matrices `rhos` of each component in `components`. As with pyquil's `lifted_pauli`,
+    which `linear_inv_state_estimate` uses, the first qubit of `qubits` (and of each
+    component) is the right-most tensor factor.
+
+    This convention is that of forest-benchmarking 0.4, pinned in
+    frozen_requirements.txt. forest-benchmarking 0.7 and later make the first qubit
+    the left-most tensor factor instead, which would mirror the state.
+    """
+    rho = functools.reduce(np.kron, rhos, np.ones((1, 1)))
+    # Tensor factors of `rho` from left to right
+    order = list(itertools.chain.from_iterable(c[::-1] for c in components))
+    n = len(order)
+    perm = [order.index(q) for q in qubits[::-1]]
+    rho = rho.reshape([2] * 2 * n).transpose(perm + [n + p for p in perm])
+    return rho.reshape(2 ** n, 2 ** n)
+
+
+def parse_pauli_string(pauli_string: str) -> PauliTerm:
+    """
+    Returns the Pauli term described by a compact string such as "Z0Z1" or "X2"
+    """
+    if not re.fullmatch(r"([XYZ]\d+)+", pauli_string):
+        raise ValueError(f"Invalid Pauli string: {pauli_string}")
+    ops = [(op, int(q)) for op, q in re.findall(r"([XYZ])(\d+)", pauli_string)]
+    if len(set(q for _, q in ops)) != len(ops):
+        raise ValueError(f"Repeated qubit in Pauli string: {pauli_string}")
+    return PauliTerm.from_list(ops)
+
+
+def group_observables(terms: List[PauliTerm]) -> List[List[PauliTerm]]:
+    """
+    Greedily groups `terms` into sets of qubit-wise commuting Pauli terms so that each
+    set can be estimated from the shots of a single measurement setting.
+
+    pyquil's exhaustive readout symmetrization runs 2^k programs for a setting acting
+    on k qubits, so a term only joins a group if measuring them together costs no
+    more than measuring them apart.
+    """
+
+    def qubitwise_commute(a: PauliTerm, b: PauliTerm) -> bool:
+        return all(a[q] == b[q] for q in set(a.get_qubits()) & set(b.get_qubits()))
+
+    def support(group: List[PauliTerm]) -> Set[int]:
+        return set(itertools.chain.from_iterable(t.get_qubits() for t in group))
+
+    groups = []
+    for term in terms:
+        if any(term in group for group in groups):
+            continue
+        term_support = set(term.get_qubits())
+        for group in groups:
+            group_support = support(group)
+            merged_cost = 2 ** len(group_support | term_support)
+            separate_cost = 2 ** len(group_support) + 2 ** len(term_support)
+            if merged_cost <= separate_cost and all(
+                qubitwise_commute(term, other) for other in group
+            ):
+                group.append(term)
+                break
+        else:
+            groups.append([term])
+    return groups